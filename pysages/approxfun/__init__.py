@@ -14,5 +14,7 @@ from .core import (
     build_grad_evaluator,
     collect_exponents,
     compute_mesh,
+    design_matrix,
+    memoize_on_model,
     scale,
 )
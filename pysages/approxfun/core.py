@@ -12,7 +12,7 @@ from jax import jit
 from jax import numpy as np
 from jax import vmap
 
-from pysages.grids import Chebyshev, Grid
+from pysages.grids import Chebyshev, Grid, get_info
 from pysages.utils import Float, JaxArray, dispatch
 
 
@@ -34,6 +34,12 @@ class AbstractFit(ABC):
     of a basis (Fourier of Chebyshev) expansion of a function (ℝⁿ ↦ ℝ)
     that minimizes the squared error with respect to a set of given
     target values.
+
+    The Moore-Penrose pseudo-inverse of the basis design matrix over the
+    grid nodes is fixed for the lifetime of the model, so it is computed
+    once here and each least-squares fit reduces to a single matrix-vector
+    product over all target values (see `build_fitter`) rather than a full
+    factorization per fit.
     """
 
     grid: Grid
@@ -273,6 +279,25 @@ def build_fitter(model: SpectralSobolev1Fit):  # noqa: F811 # pylint: disable=C0
     return jit(fit)
 
 
+def memoize_on_model(builder):
+    """
+    Memoizes one of the `build_*` functions on the signature of its `model`
+    argument (its type plus the information defining its grid), so replicas
+    and warm restarts sharing a model reuse the already-built — and
+    already jit-compiled — closure instead of forcing XLA to recompile it.
+    """
+    cache = {}
+
+    def build(model):
+        key = (type(model), get_info(model.grid))
+        try:
+            return cache[key]
+        except KeyError:
+            return cache.setdefault(key, builder(model))
+
+    return build
+
+
 def build_evaluator(model):
     """
     Returns a method to evaluate the Fourier or Chebyshev expansion defined
@@ -302,6 +327,24 @@ def build_evaluator(model):
     return jit(evaluate)
 
 
+def design_matrix(model, x):
+    """
+    Returns the matrix `Φ` of the basis functions of `model` evaluated at `x`,
+    such that evaluating a `fun: Fun` at `x` reduces to the matrix-vector
+    product `fun.scale * (Φ @ fun.coefficients + fun.c0)`. Precomputing `Φ`
+    amortizes the basis evaluation when the same set of points is evaluated
+    for many different coefficient vectors.
+    """
+    vander = vander_builder(model.grid, model.exponents)
+    x = scale(np.array(x, ndmin=2), grid=model.grid)
+    A = vander(x)
+
+    if model.is_periodic:
+        return np.hstack((np.real(A), np.imag(A)))
+
+    return A
+
+
 def build_grad_evaluator(model):
     """
     Returns a method to evaluate the gradient of a Fourier or Chebyshev
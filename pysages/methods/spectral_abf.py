@@ -14,12 +14,16 @@ simulation, which is done from the continuous approximation to the generalized m
 provided by the basis functions expansion.
 """
 
-from typing import NamedTuple, Tuple
+from functools import lru_cache, reduce
+from operator import mul
+from typing import NamedTuple
 
-from jax import jit
+from jax import device_get, jit
 from jax import numpy as np
-from jax.lax import cond
-from jax.scipy.linalg import solve
+from jax import vmap
+from jax.lax import cond, scan
+from jax.scipy.linalg import cho_factor, cho_solve
+from jax.tree_util import tree_flatten, tree_map, tree_unflatten
 
 from pysages.approxfun import (
     Fun,
@@ -28,13 +32,21 @@ from pysages.approxfun import (
     build_fitter,
     build_grad_evaluator,
     compute_mesh,
+    design_matrix,
+    memoize_on_model,
 )
-from pysages.grids import Chebyshev, Grid, build_indexer, convert
+from pysages.grids import Chebyshev, Grid, build_grid, build_indexer, convert, get_info
 from pysages.methods.core import GriddedSamplingMethod, Result, generalize
 from pysages.methods.restraints import apply_restraints
 from pysages.methods.utils import numpyfy_vals
 from pysages.utils import Bool, Int, JaxArray, dispatch
 
+# Identical models produce identical fit and evaluation closures, so share
+# them (and their jit-compiled artifacts) between replicas and warm restarts.
+build_fitter = memoize_on_model(build_fitter)
+build_evaluator = memoize_on_model(build_evaluator)
+build_grad_evaluator = memoize_on_model(build_grad_evaluator)
+
 
 class SpectralABFState(NamedTuple):
     """
@@ -49,14 +61,20 @@ class SpectralABFState(NamedTuple):
     bias: JaxArray [natoms, 3]
         Array with biasing forces for each particle.
 
-    hist: JaxArray [grid.shape]
-        Histogram of visits to the bins in the collective variable grid.
+    hist: JaxArray [prod(grid.shape)]
+        Histogram of visits to the bins in the collective variable grid. Kept
+        flattened (row-major) so the per-step bin update is a single
+        one-dimensional scatter.
 
-    Fsum: JaxArray [grid.shape, cvs.shape]
-        The cumulative force recorded at each bin of the CV grid.
+    Fsum: JaxArray [prod(grid.shape), cvs.shape]
+        The cumulative force recorded at each bin of the CV grid, one
+        (flattened, row-major) row of CV components per bin.
 
-    force: JaxArray [grid.shape, cvs.shape]
-        Average force at each bin of the CV grid.
+    force_mean: JaxArray [prod(grid.shape), cvs.shape]
+        Running average of the force at each bin of the CV grid, laid out
+        like `Fsum`. Only the bin visited in a step changes, so it is
+        maintained incrementally instead of recomputed from `Fsum` and
+        `hist` at every fitting step.
 
     Wp: JaxArray [cvs.shape]
         Estimate of the product $W p$ where `p` is the matrix of momenta and
@@ -69,19 +87,25 @@ class SpectralABFState(NamedTuple):
         Object that holds the coeffients of the basis functions
         approximation to the free energy.
 
-    nstep: int
-        Count the number of times the method's update has been called.
+    steps_to_next_fit: int
+        Countdown to the next fitting step. A fit takes place when it
+        reaches zero, at which point it is reset to `fit_freq - 1`.
+
+    in_fitting_regime: bool
+        Whether a fit of the free energy has already taken place, and hence
+        biasing from the basis functions expansion has started.
     """
 
     xi: JaxArray
     bias: JaxArray
     hist: JaxArray
     Fsum: JaxArray
-    force: JaxArray
+    force_mean: JaxArray
     Wp: JaxArray
     Wp_: JaxArray
     fun: Fun
-    nstep: Int
+    steps_to_next_fit: Int
+    in_fitting_regime: Bool
 
     def __repr__(self):
         return repr("PySAGES " + type(self).__name__)
@@ -91,7 +115,8 @@ class PartialSpectralABFState(NamedTuple):
     xi: JaxArray
     hist: JaxArray
     Fsum: JaxArray
-    ind: Tuple
+    ind: Int
+    ind_clamped: Int
     fun: Fun
     pred: Bool
 
@@ -123,6 +148,14 @@ class SpectralABF(GriddedSamplingMethod):
     fit_threshold: Optional[int] = 500
         Number of time steps after which fitting starts to take place.
 
+    dtype_hist: Optional[DTypeLike] = uint16
+        Data type of the visits histogram. The default halves the memory
+        traffic of the per-step update relative to `uint32`. A bin whose
+        count reaches the maximum representable value freezes — further
+        samples update neither its count nor its accumulated force, so its
+        mean force stays that of the recorded samples — hence pass a wider
+        type if bins are expected to be visited more than 65535 times.
+
     restraints: Optional[CVRestraints] = None
         If provided, indicate that harmonic restraints will be applied when any
         collective variable lies outside the box from `restraints.lower` to
@@ -136,8 +169,8 @@ class SpectralABF(GriddedSamplingMethod):
         self.N = np.asarray(self.kwargs.get("N", 500))
         self.fit_freq = self.kwargs.get("fit_freq", 100)
         self.fit_threshold = self.kwargs.get("fit_threshold", 500)
-        self.grid = self.grid if self.grid.is_periodic else convert(self.grid, Grid[Chebyshev])
-        self.model = SpectralGradientFit(self.grid)
+        self.dtype_hist = self.kwargs.get("dtype_hist", np.uint16)
+        self.grid, self.model = _build_model(*get_info(self.grid))
 
     def build(self, snapshot, helpers):
         """
@@ -146,6 +179,19 @@ class SpectralABF(GriddedSamplingMethod):
         return _spectral_abf(self, snapshot, helpers)
 
 
+@lru_cache(maxsize=None)
+def _build_model(*grid_args):
+    """
+    Builds the (Chebyshev-converted when non-periodic) grid and the spectral
+    model for a given grid signature. Both are immutable and hold sizable
+    precomputed arrays, so they are cached to be shared by the many identical
+    method instances spawned for multiple-replica runs.
+    """
+    grid = build_grid(*grid_args)
+    grid = grid if grid.is_periodic else convert(grid, Grid[Chebyshev])
+    return grid, SpectralGradientFit(grid)
+
+
 def _spectral_abf(method, snapshot, helpers):
     cv = method.cv
     grid = method.grid
@@ -155,53 +201,264 @@ def _spectral_abf(method, snapshot, helpers):
     dt = snapshot.dt
     dims = grid.shape.size
     natoms = np.size(snapshot.positions, 0)
+    grid_shape = tuple(int(n) for n in grid.shape)
+    nbins = reduce(mul, grid_shape)
+    # Number of steps until the first fit, chosen so fits fire on the same
+    # steps as the former `nstep > fit_threshold and nstep % fit_freq == 1`
+    # schedule. Tracking a countdown in the state replaces the per-step
+    # integer modulo with a decrement and a comparison against zero.
+    first_fit_countdown = fit_threshold + (-fit_threshold) % fit_freq
 
     # Helper methods
+    accumulate = build_grid_accumulator(grid)
+    linearize = build_linear_indexer(grid)
     get_grid_index = build_indexer(grid)
     fit = build_fitter(method.model)
     fit_forces = build_free_energy_fitter(method, fit)
     estimate_force = build_force_estimator(method)
 
+    if dims == 1:
+        # With a single CV the Moore-Penrose projection of the momenta and the
+        # bias force projection degenerate to scalar operations on Jxi
+        def project_momenta(Jxi, p):
+            return (Jxi @ p) / np.sum(np.square(Jxi))
+
+        def project_bias(Jxi, force, shape):
+            return np.reshape(-force * Jxi, shape)
+
+    else:
+        solve = build_symmetric_solver(dims)
+
+        def project_momenta(Jxi, p):
+            # Both contractions consume Jxi, so spelling them as einsums lets
+            # XLA schedule them within a single pass over the Jacobian, which
+            # dominates the memory traffic when the atom count is large.
+            G = np.einsum("di,ei->de", Jxi, Jxi)
+            b = np.einsum("di,i->d", Jxi, p)
+            return solve(G, b)
+
+        def project_bias(Jxi, force, shape):
+            # Contracting over the CV dimension with Jxi viewed in its natural
+            # `[cvs, natoms, 3]` layout writes the bias directly in the shape
+            # of the forces array, with no transposed copy of the Jacobian and
+            # no reshape of the result.
+            return -np.einsum("dij,d->ij", Jxi.reshape(dims, *shape), force)
+
+    @jit
     def initialize():
         xi, _ = cv(helpers.query(snapshot))
         bias = np.zeros((natoms, helpers.dimensionality()))
-        hist = np.zeros(grid.shape, dtype=np.uint32)
-        Fsum = np.zeros((*grid.shape, dims))
-        force = np.zeros(dims)
-        Wp = np.zeros(dims)
-        Wp_ = np.zeros(dims)
-        fun = fit(Fsum)
-        return SpectralABFState(xi, bias, hist, Fsum, force, Wp, Wp_, fun, 1)
+        hist = np.zeros(nbins, dtype=method.dtype_hist)
+        Fsum = np.zeros((nbins, dims), dtype=np.float32)
+        force_mean = np.zeros((nbins, dims), dtype=np.float32)
+        Wp = np.zeros(dims, dtype=np.float32)
+        Wp_ = np.zeros(dims, dtype=np.float32)
+        fun = fit(Fsum.reshape(*grid_shape, dims))
+        return SpectralABFState(
+            xi, bias, hist, Fsum, force_mean, Wp, Wp_, fun, first_fit_countdown, False
+        )
 
+    @jit
     def update(state, data):
         # During the intial stage use ABF
-        nstep = state.nstep
-        in_fitting_regime = nstep > fit_threshold
-        in_fitting_step = in_fitting_regime & (nstep % fit_freq == 1)
+        in_fitting_step = state.steps_to_next_fit == 0
+        in_fitting_regime = state.in_fitting_regime | in_fitting_step
+        steps_to_next_fit = np.where(in_fitting_step, fit_freq - 1, state.steps_to_next_fit - 1)
         # Fit forces
         fun = fit_forces(state, in_fitting_step)
         # Compute the collective variable and its jacobian
         xi, Jxi = cv(data)
         #
         p = data.momenta
-        Wp = solve(Jxi @ Jxi.T, Jxi @ p, sym_pos="sym")
+        Wp = project_momenta(Jxi, p).astype(np.float32)
         # Second order backward finite difference
         dWp_dt = (1.5 * Wp - 2.0 * state.Wp + 0.5 * state.Wp_) / dt
+        # The force estimated in the previous step is reproduced from the
+        # carried quantities (the previous CV value, grid data, and expansion)
+        # rather than stored in the state.
+        force_ = estimate_force(
+            PartialSpectralABFState(
+                state.xi,
+                state.hist,
+                state.Fsum,
+                *linearize(get_grid_index(state.xi)),
+                state.fun,
+                state.in_fitting_regime,
+            )
+        )
         #
-        I_xi = get_grid_index(xi)
-        hist = state.hist.at[I_xi].add(1)
-        Fsum = state.Fsum.at[I_xi].add(dWp_dt + state.force)
+        I_xi, I_xi_clamped = linearize(get_grid_index(xi))
+        hist, Fsum, force_mean = accumulate(
+            state.hist, state.Fsum, state.force_mean, I_xi, dWp_dt + force_
+        )
         #
         force = estimate_force(
-            PartialSpectralABFState(xi, hist, Fsum, I_xi, fun, in_fitting_regime)
+            PartialSpectralABFState(xi, hist, Fsum, I_xi, I_xi_clamped, fun, in_fitting_regime)
         )
-        bias = np.reshape(-Jxi.T @ force, state.bias.shape)
+        bias = project_bias(Jxi, force, state.bias.shape)
         #
-        return SpectralABFState(xi, bias, hist, Fsum, force, Wp, state.Wp, fun, state.nstep + 1)
+        return SpectralABFState(
+            xi,
+            bias,
+            hist,
+            Fsum,
+            force_mean,
+            Wp,
+            state.Wp,
+            fun,
+            steps_to_next_fit,
+            in_fitting_regime,
+        )
+
+    # The backends drive the method one step at a time. Integrators that can
+    # hand in a whole block of per-step inputs (e.g. `fit_freq` frames of
+    # positions and momenta stacked along a leading axis) can advance the
+    # state with a single XLA call through this scanned version of `update`.
+    method.step_block = build_block_stepper(update)
 
     return snapshot, initialize, generalize(update, helpers)
 
 
+def build_block_stepper(update):
+    """
+    Wraps a concrete `update` function in a `lax.scan` over a block of
+    per-step inputs, so an entire block runs as one compiled XLA loop and
+    pays a single Python→XLA round trip instead of one per step. The
+    returned function takes the current state and the batched inputs, and
+    returns the final state together with the trace of collective variable
+    values over the block.
+    """
+
+    def step(state, data):
+        state = update(state, data)
+        return state, state.xi
+
+    def step_block(state, data_block):
+        return scan(step, state, data_block)
+
+    return jit(step_block)
+
+
+def build_symmetric_solver(dims: int):
+    """
+    Returns a solver for symmetric positive-definite `dims × dims` systems,
+    specialized at build time for the (statically known) number of collective
+    variables. For `dims <= 3` the solution is computed from the closed-form
+    inverse, which avoids dispatching into a general LAPACK-style factorization
+    for what amounts to a handful of scalar operations; larger systems fall
+    back to a Cholesky factorization.
+    """
+    if dims == 1:
+
+        def solve(A, b):
+            return b / A.squeeze()
+
+    elif dims == 2:
+
+        def solve(A, b):
+            a, c = A[0, 0], A[0, 1]
+            d = A[1, 1]
+            det = a * d - c * c
+            return np.stack((d * b[0] - c * b[1], a * b[1] - c * b[0])) / det
+
+    elif dims == 3:
+
+        def solve(A, b):
+            a, c, e = A[0, 0], A[0, 1], A[0, 2]
+            d, f = A[1, 1], A[1, 2]
+            g = A[2, 2]
+            # Rows of the (symmetric) adjugate of A
+            r0 = np.stack((d * g - f * f, e * f - c * g, c * f - d * e))
+            r1 = np.stack((e * f - c * g, a * g - e * e, c * e - a * f))
+            r2 = np.stack((c * f - d * e, c * e - a * f, a * d - c * c))
+            det = a * r0[0] + c * r0[1] + e * r0[2]
+            return np.stack((r0 @ b, r1 @ b, r2 @ b)) / det
+
+    else:
+
+        def solve(A, b):
+            return cho_solve(cho_factor(A, lower=True), b)
+
+    return solve
+
+
+def out_of_bounds(ind, shape):
+    """
+    Returns whether the multi-index `ind` falls outside a grid of the given
+    `shape` (`build_indexer` flags out-of-bounds values as `index == shape`).
+    The per-dimension comparisons are folded with scalar ORs over the
+    statically known CV dimension, avoiding the construction of a small
+    intermediate array just to `any`-reduce it.
+    """
+    return reduce(np.logical_or, (i == n for i, n in zip(ind, shape)))
+
+
+def build_linear_indexer(grid: Grid):
+    """
+    Returns a function that folds the tuple of bin indices produced by
+    `build_indexer` into a pair of row-major linear indices — one for
+    scattered updates and one for gathers — matching the flattened layout of
+    the grid tensors. The fold runs over the statically known CV dimension
+    with scalar multiply-adds against precomputed strides. For periodic grids
+    both indices coincide. For non-periodic grids, out-of-bounds samples
+    (`index == grid.shape` along any dimension) map the scatter index to the
+    one-past-the-end sentinel `nbins` — which scattered updates silently
+    drop — while the gather index clamps each dimension to the grid's edge,
+    reproducing the per-axis clamping of tuple-indexed reads from the
+    unflattened tensors.
+    """
+    shape = tuple(int(n) for n in grid.shape)
+    strides = tuple(reduce(mul, shape[k:], 1) for k in range(1, len(shape) + 1))
+    nbins = reduce(mul, shape)
+
+    def fold(I_xi):
+        return reduce(np.add, (i * s for i, s in zip(I_xi, strides)))
+
+    if grid.is_periodic:
+
+        def linearize(I_xi):
+            ind = fold(I_xi)
+            return ind, ind
+
+    else:
+
+        def linearize(I_xi):
+            ind = np.where(out_of_bounds(I_xi, grid.shape), np.uint32(nbins), fold(I_xi))
+            ind_clamped = fold(np.minimum(i, n - 1) for i, n in zip(I_xi, shape))
+            return ind, ind_clamped
+
+    return linearize
+
+
+def build_grid_accumulator(grid: Grid):
+    """
+    Returns a function that accumulates a visit count and a force sample into
+    the (flattened) `hist`, `Fsum`, and `force_mean` grid tensors at a common
+    linear bin index. Flat tensors turn the multi-dimensional scatters into
+    single strided one-dimensional updates, and sharing the gathered bin row
+    between the three tensors lets XLA fuse the read-modify-writes. The
+    running mean force is refreshed for the visited bin only, which keeps the
+    full-grid division out of the fitting step. The out-of-bounds sentinel
+    produced by `build_linear_indexer` makes all three updates no-ops.
+    """
+
+    def accumulate(hist, Fsum, force_mean, I_xi, dF):
+        # A bin whose count reaches the histogram dtype's maximum freezes
+        # entirely: the force sum stops accumulating along with the count, so
+        # the stored mean force remains the mean over the recorded samples
+        # instead of growing unboundedly as `Fsum` outpaces a stuck `hist`.
+        h = hist[I_xi]
+        saturated = h == np.iinfo(hist.dtype).max
+        h = np.where(saturated, h, h + 1)
+        F = np.where(saturated, Fsum[I_xi], Fsum[I_xi] + dF.astype(Fsum.dtype))
+        hist = hist.at[I_xi].set(h)
+        Fsum = Fsum.at[I_xi].set(F)
+        force_mean = force_mean.at[I_xi].set(F / np.maximum(h, 1))
+        return hist, Fsum, force_mean
+
+    return accumulate
+
+
 def build_free_energy_fitter(method: SpectralABF, fit):
     """
     Returns a function that given a `SpectralABFState` performs a least squares fit of the
@@ -209,11 +466,14 @@ def build_free_energy_fitter(method: SpectralABF, fit):
     of the free energy.
     """
 
+    grid_shape = tuple(int(n) for n in method.grid.shape)
+    dims = len(grid_shape)
+
+    @jit
     def _fit_forces(state):
-        shape = (*state.Fsum.shape[:-1], 1)
-        force = state.Fsum / np.maximum(state.hist.reshape(shape), 1)
-        return fit(force)
+        return fit(state.force_mean.reshape(*grid_shape, dims))
 
+    @jit
     def skip_fitting(state):
         return state.fun
 
@@ -235,26 +495,36 @@ def build_force_estimator(method: SpectralABF):
     get_grad = build_grad_evaluator(model)
 
     def average_force(state):
-        i = state.ind
+        # The clamped index reads the nearest edge bin for samples that left
+        # the grid, like tuple-indexed gathers did on the unflattened tensors
+        i = state.ind_clamped
         return state.Fsum[i] / np.maximum(state.hist[i], N)
 
     def interpolate_force(state):
-        return get_grad(state.fun, state.xi).reshape(grid.shape.size)
+        force = get_grad(state.fun, state.xi).reshape(grid.shape.size)
+        return force.astype(np.float32)
 
     def _estimate_force(state):
-        return cond(state.pred, interpolate_force, average_force, state)
+        # Both estimates are cheap (a gather and a small matvec), so computing
+        # them unconditionally and selecting with `where` trades the branch —
+        # which under `vmap` or `scan` lowers to a select anyway — for code
+        # XLA can fuse into the surrounding computation.
+        return np.where(state.pred, interpolate_force(state), average_force(state))
 
     if method.restraints is None:
         estimate_force = _estimate_force
     else:
         lo, hi, kl, kh = method.restraints
 
+        nbins = reduce(mul, (int(n) for n in grid.shape))
+
         def restraints_force(state):
             xi = state.xi.reshape(grid.shape.size)
-            return apply_restraints(lo, hi, kl, kh, xi)
+            return apply_restraints(lo, hi, kl, kh, xi).astype(np.float32)
 
         def estimate_force(state):
-            ob = np.any(np.array(state.ind) == grid.shape)  # Out of bounds condition
+            # `build_linear_indexer` maps out-of-bounds samples to `nbins`
+            ob = state.ind == nbins
             return cond(ob, restraints_force, _estimate_force, state)
 
     return estimate_force
@@ -300,37 +570,55 @@ def analyze(result: Result[SpectralABF]):
     grid = method.grid
     mesh = (compute_mesh(grid) + 1) * grid.size / 2 + grid.lower
     evaluate = build_evaluator(method.model)
+    # The mesh is the same for all replicas, so the basis functions are
+    # evaluated over it only once and each free energy reduces to a matmul.
+    Phi = design_matrix(method.model, mesh)
 
     def average_forces(hist, Fsum):
         hist = np.expand_dims(hist, hist.ndim)
         return Fsum / np.maximum(hist, 1)
 
+    def evaluate_on_mesh(fun):
+        return (fun.scale * (Phi @ fun.coefficients + fun.c0)).reshape(np.size(mesh, 0), -1)
+
     def build_fes_fn(fun):
         return jit(lambda x: evaluate(fun, x))
 
     def first_or_all(seq):
         return seq[0] if len(seq) == 1 else seq
 
-    hists = []
-    mean_forces = []
-    free_energies = []
-    funs = []
-    fes_fns = []
-
-    for s in states:
-        fes_fn = build_fes_fn(s.fun)
-        hists.append(s.hist)
-        mean_forces.append(average_forces(s.hist, s.Fsum))
-        free_energies.append(fes_fn(mesh))
-        funs.append(s.fun)
-        fes_fns.append(fes_fn)
+    # Batch the replicas along a leading axis so the mean forces and free
+    # energies are computed with a single vectorized call per quantity rather
+    # than one dispatch per replica. The internally flat grid tensors are
+    # unflattened here to the grid's shape for the returned bundle.
+    grid_shape = tuple(int(n) for n in grid.shape)
+    dims = len(grid_shape)
+    hists = np.stack([s.hist for s in states]).reshape(-1, *grid_shape)
+    Fsums = np.stack([s.Fsum for s in states]).reshape(-1, *grid_shape, dims)
+    funs = [s.fun for s in states]
+    batched_funs = tree_map(lambda *xs: np.stack(xs), *funs)
+
+    mean_forces = vmap(average_forces)(hists, Fsums)
+    free_energies = vmap(evaluate_on_mesh)(batched_funs)
+    fes_fns = [build_fes_fn(fun) for fun in funs]
 
     ana_result = dict(
-        histogram=first_or_all(hists),
-        mean_force=first_or_all(mean_forces),
-        free_energy=first_or_all(free_energies),
+        histogram=hists,
+        mean_force=mean_forces,
+        free_energy=free_energies,
         mesh=mesh,
         fun=first_or_all(funs),
         fes_fn=first_or_all(fes_fns),
     )
+    # Bring all device arrays back to the host with one batched transfer,
+    # which lets the runtime coalesce the copies, instead of triggering a
+    # blocking device-to-host round trip per array. The batched quantities
+    # stay stacked until after the transfer — one contiguous buffer each —
+    # and are only then split into the documented per-replica lists.
+    leaves, structure = tree_flatten(ana_result)
+    transferred = iter(device_get([x for x in leaves if isinstance(x, JaxArray)]))
+    leaves = [next(transferred) if isinstance(x, JaxArray) else x for x in leaves]
+    ana_result = tree_unflatten(structure, leaves)
+    for key in ("histogram", "mean_force", "free_energy"):
+        ana_result[key] = first_or_all(list(ana_result[key]))
     return numpyfy_vals(ana_result)
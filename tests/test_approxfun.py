@@ -10,6 +10,7 @@ from pysages.approxfun import (
     build_fitter,
     build_grad_evaluator,
     compute_mesh,
+    design_matrix,
 )
 from pysages.grids import Chebyshev, Grid
 
@@ -106,3 +107,32 @@ def test_cheb_approx():
     # ax.plot(x, dy)
     # ax.plot(x, get_grad(fun, x))
     # plt.show()
+
+
+def test_design_matrix():
+    # Evaluating an expansion through a precomputed design matrix must agree
+    # with the evaluator built for the same model, for both Fourier and
+    # Chebyshev bases.
+    grid = Grid(lower=(-np.pi,), upper=(np.pi,), shape=(128,), periodic=True)
+
+    x = np.pi * compute_mesh(grid)
+    dy = vmap(grad(f))(x.flatten()).reshape(x.shape)
+
+    model = SpectralGradientFit(grid)
+    fun = build_fitter(model)(dy)
+    evaluate = build_evaluator(model)
+
+    y = fun.scale * (design_matrix(model, x) @ fun.coefficients + fun.c0)
+    assert np.all(np.isclose(y.flatten(), evaluate(fun, x).flatten())).item()
+
+    grid = Grid[Chebyshev](lower=(-1.0,), upper=(1.0,), shape=(128,))
+
+    x = compute_mesh(grid)
+    dy = vmap(grad(g))(x.flatten()).reshape(x.shape)
+
+    model = SpectralGradientFit(grid)
+    fun = build_fitter(model)(dy)
+    evaluate = build_evaluator(model)
+
+    y = fun.scale * (design_matrix(model, x) @ fun.coefficients + fun.c0)
+    assert np.all(np.isclose(y.flatten(), evaluate(fun, x).flatten())).item()